@@ -1,14 +1,20 @@
 import os
-import json
+import orjson
 import logging
+from datetime import datetime, timezone
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
-from lib.notion_manager import NotionManager
-from lib.slack_manager import SlackManager
-from lib.jira_manager import JiraManager
 from lib.logger import setup_logger
+from lib.sent_reports import send_changed_reports
+
+if TYPE_CHECKING:
+    from lib.slack_manager import SlackManager
 
-setup_logger()
 load_dotenv()
+setup_logger()
 
 JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
 JIRA_USER_NAME = os.getenv("JIRA_USER_NAME")
@@ -16,33 +22,50 @@ NOTION_TOKEN = os.getenv("NOTION_TOKEN")
 DATABASE_ID = os.getenv("NOTION_DATABASE_ID")
 SLACK_TOKEN = os.getenv("SLACK_TOKEN")
 
+REQUIRED_ENV = ("JIRA_API_TOKEN", "JIRA_USER_NAME", "NOTION_TOKEN", "NOTION_DATABASE_ID", "SLACK_TOKEN")
+
 JIRA_USERS_JSON = os.getenv("JIRA_USERS", "[]")
 try:
-    JIRA_USERS = json.loads(JIRA_USERS_JSON)
-except (json.JSONDecodeError, TypeError) as e:
+    JIRA_USERS = orjson.loads(JIRA_USERS_JSON)
+except (orjson.JSONDecodeError, TypeError) as e:
     logging.error(f"Failed to parse JIRA_USERS: {e}")
     JIRA_USERS = []
 
+# Owner name -> Slack user id, for entries that can actually receive a report
+JIRA_USERS_MAP = {
+    u["name"]: u["slack_user_id"] for u in JIRA_USERS if u.get("name") and u.get("slack_user_id")
+}
+_skipped_users = [u.get("name") for u in JIRA_USERS if not (u.get("name") and u.get("slack_user_id"))]
+if _skipped_users:
+    logging.warning(f"Skipping users {_skipped_users} - missing name or slack_user_id")
+
+DONE_SET = frozenset({"Done", "Completed", "Closed"})
+# One report line per record; NotionManager records always carry these keys
+_REC_TMPL = "• <{jiraUrl}|{jiraId}> {title} `{status}`"
+_BY_STATUS = itemgetter("status")
+
+SENT_REPORTS_PATH = "logs/.weekly_report_sent.json"
+
 def _format_records(records):
-    lines = []
-    for record in records:
-        ticket_link = f"<{record['jiraUrl']}|{record['jiraId']}>"
-        status = record.get("status", "")
-        lines.append(f"• {ticket_link} {record['title']} `{status}`")
-    return "\n".join(lines)
+    return [_REC_TMPL.format_map(r) for r in records]
 
 def _build_report(sprint_names, ongoing, completed):
-    message = f"*🏃 Sprint:* {sprint_names}\n\n"
-    message += "*🔄 Ongoing:*\n"
-    if ongoing:
-        message += _format_records(ongoing)
-    message += "\n\n*✅ Completed:*\n"
-    if completed:
-        message += _format_records(completed)
-    message += "\n\n*📝 Summary:*\n"
-    return message
-
-def send_error_to_slack(error_message: str, slack_manager: SlackManager, slack_token: str):
+    # Section lines are collected in one list and joined once; an empty
+    # section keeps its blank line so the layout does not shift
+    parts = [f"*🏃 Sprint:* {sprint_names}", "", "*🔄 Ongoing:*"]
+    parts.extend(_format_records(ongoing) or [""])
+    parts += ["", "*✅ Completed:*"]
+    parts.extend(_format_records(completed) or [""])
+    parts += ["", "*📝 Summary:*", ""]
+    return "\n".join(parts)
+
+def _require_env(names):
+    """Fail fast before any network call if mandatory configuration is missing"""
+    missing = [name for name in names if not os.getenv(name)]
+    if missing:
+        raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
+
+def send_error_to_slack(error_message: str, slack_manager: "SlackManager", slack_token: str):
     """Send error message to Slack"""
     try:
         # Send error to first available user or admin
@@ -58,11 +81,18 @@ def send_error_to_slack(error_message: str, slack_manager: SlackManager, slack_t
 def main():
     logger = logging.getLogger(__name__)
     logger.info("Starting Weekly Report Bot")
+
+    # The managers pull in the HTTP stack, so only load them when actually running
+    from lib.notion_manager import NotionManager
+    from lib.slack_manager import SlackManager, SLACK_MAX_WORKERS
+    from lib.jira_manager import JiraManager
     
     slack_manager = None
     slack_token = SLACK_TOKEN
     
     try:
+        _require_env(REQUIRED_ENV)
+
         notion_manager = NotionManager(
             notion_token=NOTION_TOKEN,
             database_id=DATABASE_ID,
@@ -72,61 +102,59 @@ def main():
         slack_manager = SlackManager()
         jira_manager = JiraManager(JIRA_USERS, JIRA_USER_NAME, JIRA_API_TOKEN)
 
-        # Get Notion records
-        logger.info("Fetching Notion records...")
-        notion_records = notion_manager.get_all_records()
-        logger.info(f"Retrieved {len(notion_records)} Notion records")
-
-        # Get active sprints from Jira
-        logger.info("Fetching active sprints from Jira...")
-        jira_raw = jira_manager.get_tickets()
-        jira_filtered = jira_manager.filter_data(jira_raw)
-        active_sprints = slack_manager._extract_active_sprints(jira_filtered)
+        # Fetch active sprints from Jira in the background while Notion
+        # records stream into per-owner (ongoing, completed) buckets
+        logger.info("Fetching Notion records and active sprints from Jira...")
+        buckets = defaultdict(lambda: ([], []))
+        notion_record_count = 0
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            jira_future = executor.submit(jira_manager.get_active_sprints)
+            for r in notion_manager.iter_all_records_cached():
+                notion_record_count += 1
+                ongoing, completed = buckets[r.get("owner")]
+                (completed if r.get("status") in DONE_SET else ongoing).append(r)
+            active_sprints = frozenset(jira_future.result())
+        logger.info(f"Retrieved {notion_record_count} Notion records")
         logger.info(f"Found {len(active_sprints)} active sprints")
 
         # Process each user
         logger.info("Processing weekly reports for all users...")
-        for user_config in JIRA_USERS:
-            owner = user_config.get("name")
-            slack_user_id = user_config.get("slack_user_id")
-            if not owner or not slack_user_id:
-                logger.warning(f"Skipping user {owner} - missing name or slack_user_id")
+        default_sprint_names = ", ".join(sorted(active_sprints))
+        payloads = []
+        for owner, slack_user_id in JIRA_USERS_MAP.items():
+            # Buckets only exist for owners with at least one record; keep the
+            # active ones, in status order as the report has always listed them
+            if owner in buckets:
+                ongoing, completed = (
+                    sorted((r for r in group if r.get("sprint") in active_sprints), key=_BY_STATUS)
+                    for group in buckets[owner]
+                )
+            else:
+                ongoing = completed = ()
+            if not ongoing and not completed:
+                logger.info(f"No records for {owner}, skipping")
                 continue
 
             logger.info(f"Processing weekly report for user: {owner}")
-            
-            user_records = [
-                r for r in notion_records
-                if r.get("owner") == owner and r.get("sprint") in active_sprints
-            ]
-            ongoing = [
-                r for r in user_records
-                if r.get("status") not in ("Done", "Completed", "Closed")
-            ]
-            completed = [
-                r for r in user_records
-                if r.get("status") in ("Done", "Completed", "Closed")
-            ]
-
-            user_sprints = sorted({r.get("sprint") for r in user_records if r.get("sprint")})
-            sprint_names = ", ".join(user_sprints) if user_sprints else ", ".join(sorted(active_sprints))
+
+            user_sprints = sorted({
+                r["sprint"] for group in (ongoing, completed) for r in group if r.get("sprint")
+            })
+            sprint_names = ", ".join(user_sprints) if user_sprints else default_sprint_names
             message = _build_report(sprint_names, ongoing, completed)
-            
-            success = slack_manager.send_direct_message(message, slack_user_id, slack_token)
-            if success:
-                logger.info(f"Weekly report sent successfully to {owner}")
-            else:
-                logger.warning(f"Failed to send weekly report to {owner}")
+            payloads.append((owner, message, slack_user_id))
+
+        # Send all reports concurrently, skipping any unchanged since the last run
+        send_changed_reports(slack_manager, payloads, slack_token, SENT_REPORTS_PATH, SLACK_MAX_WORKERS)
 
         logger.info("Weekly Report Bot completed successfully")
 
     except Exception as e:
-        error_message = f"Error occurred in Weekly Report Bot:\n\n*Error Type:* {type(e).__name__}\n*Error Message:* {str(e)}\n*Timestamp:* {logging.Formatter().formatTime(logging.LogRecord('', 0, '', 0, '', (), None))}"
-        
         logger.error(f"Weekly Report Bot failed: {e}", exc_info=True)
         
         # Send error notification to Slack
         if slack_manager and slack_token:
+            error_message = f"Error occurred in Weekly Report Bot:\n\n*Error Type:* {type(e).__name__}\n*Error Message:* {str(e)}\n*Timestamp:* {datetime.now(timezone.utc).isoformat(timespec='seconds')}"
             send_error_to_slack(error_message, slack_manager, slack_token)
         
         # Re-raise the exception to ensure proper exit code
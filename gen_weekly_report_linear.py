@@ -1,11 +1,17 @@
 import os
-import json
+import orjson
 import logging
+from datetime import datetime, timezone
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
-from lib.notion_manager import NotionManager
-from lib.slack_manager import SlackManager
-from lib.linear_manager import LinearManager
 from lib.logger import setup_logger
+from lib.sent_reports import send_changed_reports
+
+if TYPE_CHECKING:
+    from lib.slack_manager import SlackManager
 
 setup_logger()
 load_dotenv()
@@ -15,38 +21,47 @@ LINEAR_ORG_SLUG = os.getenv("LINEAR_ORG_SLUG")
 
 LINEAR_USERS_JSON = os.getenv("LINEAR_USERS", "[]")
 try:
-    LINEAR_USERS = json.loads(LINEAR_USERS_JSON)
-except (json.JSONDecodeError, TypeError) as e:
+    LINEAR_USERS = orjson.loads(LINEAR_USERS_JSON)
+except (orjson.JSONDecodeError, TypeError) as e:
     logging.error(f"Failed to parse LINEAR_USERS: {e}")
     LINEAR_USERS = []
 
+# Owner name -> Slack user id, for entries that can actually receive a report
+LINEAR_USERS_MAP = {
+    u["name"]: u["slack_user_id"] for u in LINEAR_USERS if u.get("name") and u.get("slack_user_id")
+}
+_skipped_users = [u.get("name") for u in LINEAR_USERS if not (u.get("name") and u.get("slack_user_id"))]
+if _skipped_users:
+    logging.warning(f"Skipping users {_skipped_users} - missing name or slack_user_id")
+
 NOTION_TOKEN = os.getenv("LINEAR_NOTION_TOKEN") or os.getenv("NOTION_TOKEN")
 DATABASE_ID = os.getenv("LINEAR_NOTION_DATABASE_ID")
 SLACK_TOKEN = os.getenv("SLACK_TOKEN")
 
+DONE_SET = frozenset({"Done", "Completed", "Closed", "Cancelled"})
+# One report line per record; NotionManager records always carry these keys
+_REC_TMPL = "• <{jiraUrl}|{jiraId}> {title} `{status}`"
+_BY_STATUS = itemgetter("status")
+
+SENT_REPORTS_PATH = "logs/.weekly_report_linear_sent.json"
+
 
 def _format_records(records):
-    lines = []
-    for record in records:
-        ticket_link = f"<{record['jiraUrl']}|{record['jiraId']}>"
-        status = record.get("status", "")
-        lines.append(f"• {ticket_link} {record['title']} `{status}`")
-    return "\n".join(lines)
+    return [_REC_TMPL.format_map(r) for r in records]
 
 
 def _build_report(sprint_names, ongoing, completed):
-    message = f"*🏃 Cycle:* {sprint_names}\n\n"
-    message += "*🔄 Ongoing:*\n"
-    if ongoing:
-        message += _format_records(ongoing)
-    message += "\n\n*✅ Completed:*\n"
-    if completed:
-        message += _format_records(completed)
-    message += "\n\n*📝 Summary:*\n"
-    return message
-
-
-def send_error_to_slack(error_message: str, slack_manager: SlackManager, slack_token: str):
+    # Section lines are collected in one list and joined once; an empty
+    # section keeps its blank line so the layout does not shift
+    parts = [f"*🏃 Cycle:* {sprint_names}", "", "*🔄 Ongoing:*"]
+    parts.extend(_format_records(ongoing) or [""])
+    parts += ["", "*✅ Completed:*"]
+    parts.extend(_format_records(completed) or [""])
+    parts += ["", "*📝 Summary:*", ""]
+    return "\n".join(parts)
+
+
+def send_error_to_slack(error_message: str, slack_manager: "SlackManager", slack_token: str):
     try:
         if LINEAR_USERS:
             admin_user_id = LINEAR_USERS[0].get("slack_user_id")
@@ -62,6 +77,11 @@ def main():
     logger = logging.getLogger(__name__)
     logger.info("Starting Linear Weekly Report Bot")
 
+    # The managers pull in the HTTP stack, so only load them when actually running
+    from lib.notion_manager import NotionManager
+    from lib.slack_manager import SlackManager, SLACK_MAX_WORKERS
+    from lib.linear_manager import LinearManager
+
     slack_manager = None
     slack_token = SLACK_TOKEN
 
@@ -78,64 +98,64 @@ def main():
         )
         slack_manager = SlackManager()
 
-        # Fetch Notion records
-        logger.info("Fetching Notion records...")
-        notion_records = notion_manager.get_all_records()
-        logger.info(f"Retrieved {len(notion_records)} Notion records")
-
-        # Fetch active cycles from Linear
-        logger.info("Fetching active cycles from Linear...")
-        linear_raw = linear_manager.get_tickets()
-        linear_filtered = linear_manager.filter_data(linear_raw)
-        active_sprints = slack_manager._extract_active_sprints(linear_filtered)
+        # Fetch active cycles from Linear in the background while Notion
+        # records stream into per-owner (ongoing, completed) buckets
+        logger.info("Fetching Notion records and active cycles from Linear...")
+        buckets = defaultdict(lambda: ([], []))
+        notion_record_count = 0
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            linear_future = executor.submit(lambda: linear_manager.filter_data(linear_manager.get_tickets()))
+            for r in notion_manager.iter_all_records_cached():
+                notion_record_count += 1
+                ongoing, completed = buckets[r.get("owner")]
+                (completed if r.get("status") in DONE_SET else ongoing).append(r)
+            linear_filtered = linear_future.result()
+        active_sprints = frozenset(slack_manager._extract_active_sprints(linear_filtered))
+        logger.info(f"Retrieved {notion_record_count} Notion records")
         logger.info(f"Found {len(active_sprints)} active cycles")
 
         # Process each user
         logger.info("Processing weekly reports for all users...")
-        for user_config in LINEAR_USERS:
-            owner = user_config.get("name")
-            slack_user_id = user_config.get("slack_user_id")
-            if not owner or not slack_user_id:
-                logger.warning(f"Skipping user {owner} - missing name or slack_user_id")
+        default_sprint_names = ", ".join(sorted(active_sprints))
+        payloads = []
+        for owner, slack_user_id in LINEAR_USERS_MAP.items():
+            # Buckets only exist for owners with at least one record; keep the
+            # active ones, in status order as the report has always listed them
+            if owner in buckets:
+                ongoing, completed = (
+                    sorted((r for r in group if r.get("sprint") in active_sprints), key=_BY_STATUS)
+                    for group in buckets[owner]
+                )
+            else:
+                ongoing = completed = ()
+            if not ongoing and not completed:
+                logger.info(f"No records for {owner}, skipping")
                 continue
 
             logger.info(f"Processing weekly report for user: {owner}")
 
-            user_records = [
-                r for r in notion_records
-                if r.get("owner") == owner and r.get("sprint") in active_sprints
-            ]
-            ongoing = [
-                r for r in user_records
-                if r.get("status") not in ("Done", "Completed", "Closed", "Cancelled")
-            ]
-            completed = [
-                r for r in user_records
-                if r.get("status") in ("Done", "Completed", "Closed", "Cancelled")
-            ]
-
-            user_sprints = sorted({r.get("sprint") for r in user_records if r.get("sprint")})
-            sprint_names = ", ".join(user_sprints) if user_sprints else ", ".join(sorted(active_sprints))
+            user_sprints = sorted({
+                r["sprint"] for group in (ongoing, completed) for r in group if r.get("sprint")
+            })
+            sprint_names = ", ".join(user_sprints) if user_sprints else default_sprint_names
             message = _build_report(sprint_names, ongoing, completed)
+            payloads.append((owner, message, slack_user_id))
 
-            success = slack_manager.send_direct_message(message, slack_user_id, slack_token)
-            if success:
-                logger.info(f"Weekly report sent successfully to {owner}")
-            else:
-                logger.warning(f"Failed to send weekly report to {owner}")
+        # Send all reports concurrently, skipping any unchanged since the last run
+        send_changed_reports(slack_manager, payloads, slack_token, SENT_REPORTS_PATH, SLACK_MAX_WORKERS)
 
         logger.info("Linear Weekly Report Bot completed successfully")
 
     except Exception as e:
-        error_message = (
-            f"Error occurred in Linear Weekly Report Bot:\n\n"
-            f"*Error Type:* {type(e).__name__}\n"
-            f"*Error Message:* {str(e)}\n"
-            f"*Timestamp:* {logging.Formatter().formatTime(logging.LogRecord('', 0, '', 0, '', (), None))}"
-        )
         logger.error(f"Linear Weekly Report Bot failed: {e}", exc_info=True)
 
         if slack_manager and slack_token:
+            error_message = (
+                f"Error occurred in Linear Weekly Report Bot:\n\n"
+                f"*Error Type:* {type(e).__name__}\n"
+                f"*Error Message:* {str(e)}\n"
+                f"*Timestamp:* {datetime.now(timezone.utc).isoformat(timespec='seconds')}"
+            )
             send_error_to_slack(error_message, slack_manager, slack_token)
 
         raise
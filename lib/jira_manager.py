@@ -1,50 +1,106 @@
 import requests
 import base64
+import hashlib
 import json
 import logging
+import orjson
+import sys
+import time
+from collections import Counter
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lib.state_file import load_state, save_state
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-)
 logger = logging.getLogger(__name__)
 
 TYPE_TO_TAG_MAPPING = {
     "Bug": "Fix"
 }
 
+# Issue types whose tag depends on other fields; everything else uses TYPE_TO_TAG_MAPPING
+TAG_HANDLERS = {
+    "Story": lambda fields: f"Feat - {fields['parent']['fields']['summary']}" if "parent" in fields else ""
+}
+
+# On-disk cache for search results, keyed by JQL hash. Only read-only callers
+# (the weekly report's active sprint lookup) opt in; the Notion sync always
+# searches live so a rerun picks up fixes made in Jira.
+JIRA_CACHE_PATH = "logs/.jira_cache.json"
+JIRA_CACHE_TTL = 3600  # seconds
+
+JIRA_SEARCH_URL = "https://gogotech.atlassian.net/rest/api/3/search/jql"
+JIRA_PAGE_SIZE = 100
+
+# Connection pool / retry config for the shared Jira session
+JIRA_POOL_CONNECTIONS = 4
+JIRA_POOL_MAXSIZE = 8
+JIRA_MAX_RETRIES = 3
+JIRA_RETRY_BACKOFF_FACTOR = 0.5
+JIRA_RETRY_STATUSES = [429, 502, 503, 504]
+
 class JiraManager:
     def __init__(self, users, user_name, token):
         """Initialize JiraManager with authentication details"""
         # Extract jira_user_ids from the new users structure
         if isinstance(users, list):
             self.user_ids = [user.get("jira_user_id") for user in users if user.get("jira_user_id")]
-        else:
-            # Fallback for old format
+        elif isinstance(users, str):
+            # Fallback for old format (JSON-encoded list of ids)
             try:
-                self.user_ids = json.loads(users) if isinstance(users, str) else users
-            except (json.JSONDecodeError, TypeError):
+                self.user_ids = json.loads(users)
+            except json.JSONDecodeError:
                 self.user_ids = []
+        else:
+            self.user_ids = users or []
+        if not self.user_ids:
+            raise ValueError("No Jira user ids configured")
+
+        # Construct JQL query using user_ids
+        user_ids_str = " OR ".join(f'assignee = "{user_id}"' for user_id in self.user_ids)
+        self._jql = f'({user_ids_str}) AND sprint in openSprints() AND type != Sub-task ORDER BY created DESC'
         
         self.user_name = user_name
         self.token = token
+        # Encode credentials once; every request goes through the session headers
+        self._auth = "Basic " + base64.b64encode(f"{user_name}:{token}".encode()).decode()
         self._headers = {
-            "Authorization": "Basic " + base64.b64encode(f"{user_name}:{token}".encode()).decode(),
+            "Authorization": self._auth,
             "Content-Type": "application/json"
         }
-        
-    def get_tickets(self):
-        """Get tickets from Jira API using custom JQL query"""
-        jira_api_url = "https://gogotech.atlassian.net/rest/api/3/search/jql"
-        
-        # Construct JQL query using user_ids
-        user_ids_str = " OR ".join([f'assignee = "{user_id}"' for user_id in self.user_ids])
-        jql = f'({user_ids_str}) AND sprint in openSprints() AND type != Sub-task ORDER BY created DESC'
-        
+        self._session = requests.Session()
+        self._session.headers.update(self._headers)
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=JIRA_POOL_CONNECTIONS,
+            pool_maxsize=JIRA_POOL_MAXSIZE,
+            max_retries=Retry(
+                total=JIRA_MAX_RETRIES,
+                backoff_factor=JIRA_RETRY_BACKOFF_FACTOR,
+                status_forcelist=JIRA_RETRY_STATUSES,
+                # The search endpoint is a read despite using POST
+                allowed_methods=frozenset({"GET", "POST"}),
+                raise_on_status=False
+            )
+        ))
+        self._cache_path = JIRA_CACHE_PATH
+        self._sprint_cache = None
+
+    def get_active_sprints(self):
+        """Return active sprint names collected by the last filter pass"""
+        if self._sprint_cache is None:
+            self.get_tickets_filtered(use_cache=True)
+        return self._sprint_cache
+
+    def get_tickets_filtered(self, use_cache=False):
+        """Fetch tickets and filter them, collecting active sprints in the same pass"""
+        return self.filter_data(self.get_tickets(use_cache=use_cache))
+
+    def iter_issues(self, jql):
+        """Yield issues matching the JQL query page by page using nextPageToken"""
         # Use POST method with JSON payload as per latest documentation
         # Need to specify fields to return
         payload = {
             "jql": jql,
+            "maxResults": JIRA_PAGE_SIZE,
             "fields": [
                 "summary", 
                 "status", 
@@ -57,59 +113,90 @@ class JiraManager:
             ]
         }
         
-        response = requests.post(jira_api_url, headers=self._headers, json=payload)
-        response.raise_for_status()
-        data = response.json()
+        while True:
+            response = self._session.post(JIRA_SEARCH_URL, data=orjson.dumps(payload))
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+            
+            # Check if response has the expected format
+            if "issues" not in data or not isinstance(data["issues"], list):
+                logger.error("Unexpected response format: %s", data)
+                raise ValueError("Response does not contain 'issues' list")
+            
+            yield from data["issues"]
+            
+            next_page_token = data.get("nextPageToken")
+            if data.get("isLast", True) or not next_page_token:
+                break
+            payload["nextPageToken"] = next_page_token
+
+    def get_tickets(self, use_cache=False):
+        """Get tickets from Jira API using custom JQL query.
+
+        With use_cache, results from the on-disk cache are reused for up to
+        JIRA_CACHE_TTL seconds; otherwise Jira is always queried. Either way a
+        fresh result refreshes the cache.
+        """
+        jql = self._jql
+
+        cache_key = hashlib.sha1(jql.encode()).hexdigest()
+        cache = load_state(self._cache_path)
+        entry = cache.get(cache_key)
+        if use_cache and entry and time.time() - entry.get("ts", 0) < JIRA_CACHE_TTL:
+            logger.info("Using cached Jira search results")
+            return entry["data"]
         
-        # Check if response has the expected format
-        if "issues" not in data or not isinstance(data["issues"], list):
-            logger.error(f"Unexpected response format: {data}")
-            raise ValueError("Response does not contain 'issues' list")
+        data = {"issues": list(self.iter_issues(jql))}
         
-        # Get unique active sprints from the response
-        active_sprints = set()
-        for issue in data["issues"]:
-            if isinstance(issue, dict) and "fields" in issue:
-                sprints = issue["fields"].get("customfield_10008", [])
-                for sprint in sprints:
-                    if sprint["state"] == "active":
-                        active_sprints.add(sprint["name"])
+        cache[cache_key] = {
+            "ts": time.time(),
+            "data": data
+        }
+        save_state(self._cache_path, cache)
         
-        # Log outputs
-        logger.info("="*50)
-        logger.debug(f"JQL Query: {jql}")
-        logger.info(f"Active Sprints: {sorted(active_sprints)}")
-        logger.info(f"Total Issues: {len(data['issues'])}")
-        logger.info("="*50)
+        logger.debug("JQL Query: %s", jql)
         
         return data
     
     def filter_data(self, data):
-        """Filter and format Jira data for Notion sync"""
+        """Filter and format Jira data for Notion sync.
+
+        Accepts either the dict returned by get_tickets or any iterable of raw
+        issues (e.g. iter_issues). Active sprints across all issues are
+        collected in the same loop and exposed through get_active_sprints().
+        """
+        issues = data["issues"] if isinstance(data, dict) else data
         filtered_issues = []
+        active_sprints_global = set()
+        total_issues = 0
         
-        for issue in data["issues"]:
+        for issue in issues:
+            total_issues += 1
             # Check if issue has the expected format
             if not isinstance(issue, dict) or "fields" not in issue:
-                logger.warning(f"Skipping issue with unexpected format: {issue}")
+                logger.warning("Skipping issue with unexpected format: %s", issue)
                 continue
                 
             fields = issue["fields"]
+            f_get = fields.get
             key = issue["key"]
             summary = fields["summary"]
-            status = fields["status"]["name"]
+            status = sys.intern(fields["status"]["name"])
             issue_type = fields["issuetype"]["name"]
-            tag = self.__get_tag_from_issue(issue)
+            tag_handler = TAG_HANDLERS.get(issue_type)
+            tag = tag_handler(fields) if tag_handler else TYPE_TO_TAG_MAPPING.get(issue_type, issue_type)
             
-            # Get assignee information
-            owner = fields.get("assignee", {}).get("displayName", "Unassigned")
+            # Get assignee information (Jira returns null for unassigned issues)
+            assignee = f_get("assignee") or {}
+            owner = sys.intern(assignee.get("displayName", "Unassigned"))
             
             # Get story points
-            story_points = fields.get("customfield_10027", 0)
+            story_points = f_get("customfield_10027", 0)
             
             # Get sprint information
-            sprints = fields.get("customfield_10008", [])
-            active_sprints = [sprint["name"] for sprint in sprints if sprint["state"] == "active"]
+            sprints = f_get("customfield_10008") or []
+            active_sprints = [sys.intern(sprint["name"]) for sprint in sprints if sprint["state"] == "active"]
+            active_sprints_global.update(active_sprints)
             
             # Get parent information for stories
             parent = None
@@ -132,46 +219,41 @@ class JiraManager:
             }
             
             filtered_issues.append(filtered_issue)
+
+        self._sprint_cache = active_sprints_global
+
+        # Log outputs
+        logger.info("="*50)
+        logger.info("Active Sprints: %s", sorted(active_sprints_global))
+        logger.info("Total Issues: %d", total_issues)
+        logger.info("="*50)
             
-        # Log filtered data
-        logger.debug("="*50)
-        logger.debug("Filtered Issues Summary:")
-        logger.debug(f"Total Issues: {len(filtered_issues)}")
-        logger.debug("Issue Types:")
-        issue_types = {}
-        for issue in filtered_issues:
-            issue_types[issue["type"]] = issue_types.get(issue["type"], 0) + 1
-        for type_name, count in issue_types.items():
-            logger.debug(f"- {type_name}: {count}")
-        logger.debug("="*50)
-        
-        # Print detailed information for each issue
-        logger.debug("\nDetailed Issue Information:")
-        for idx, issue in enumerate(filtered_issues, 1):
-            logger.debug(f"\n{idx}. {issue['key']} - {issue['summary']}")
-            logger.debug(f"   Type: {issue['type']}")
-            logger.debug(f"   Status: {issue['status']}")
-            logger.debug(f"   Owner: {issue['owner']}")
-            logger.debug(f"   Tag: {issue['tag']}")
-            if issue['story_points']:
-                logger.debug(f"   Story Points: {issue['story_points']}")
-            if issue['active_sprints']:
-                logger.debug(f"   Active Sprints: {', '.join(issue['active_sprints'])}")
-            if issue['parent']:
-                logger.debug(f"   Parent: {issue['parent']['key']} - {issue['parent']['summary']}")
-            logger.debug("-" * 50)
+        # Detailed logging is only worth formatting when DEBUG is enabled
+        if logger.isEnabledFor(logging.DEBUG):
+            # Log filtered data
+            logger.debug("="*50)
+            logger.debug("Filtered Issues Summary:")
+            logger.debug("Total Issues: %d", len(filtered_issues))
+            logger.debug("Issue Types:")
+            issue_types = Counter(issue["type"] for issue in filtered_issues)
+            for type_name, count in issue_types.items():
+                logger.debug("- %s: %d", type_name, count)
+            logger.debug("="*50)
+
+            # Print detailed information for each issue
+            logger.debug("\nDetailed Issue Information:")
+            for idx, issue in enumerate(filtered_issues, 1):
+                logger.debug("\n%d. %s - %s", idx, issue['key'], issue['summary'])
+                logger.debug("   Type: %s", issue['type'])
+                logger.debug("   Status: %s", issue['status'])
+                logger.debug("   Owner: %s", issue['owner'])
+                logger.debug("   Tag: %s", issue['tag'])
+                if issue['story_points']:
+                    logger.debug("   Story Points: %s", issue['story_points'])
+                if issue['active_sprints']:
+                    logger.debug("   Active Sprints: %s", ', '.join(issue['active_sprints']))
+                if issue['parent']:
+                    logger.debug("   Parent: %s - %s", issue['parent']['key'], issue['parent']['summary'])
+                logger.debug("-" * 50)
         
         return filtered_issues
-        
-    def __get_tag_from_issue(self, issue):
-        """Get tag from issue based on its type and parent"""
-        if not isinstance(issue, dict) or "fields" not in issue:
-            return "Unknown"
-            
-        fields = issue["fields"]
-        if fields["issuetype"]["name"] == "Story":
-            tag = f"Feat - {fields['parent']['fields']['summary']}" if "parent" in fields else ""
-            return tag
-
-        tag = TYPE_TO_TAG_MAPPING.get(fields["issuetype"]["name"], fields["issuetype"]["name"])
-        return tag
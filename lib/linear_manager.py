@@ -1,5 +1,6 @@
 import requests
 import logging
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
@@ -95,11 +96,16 @@ class LinearManager:
             "Authorization": token,
             "Content-Type": "application/json",
         }
+        # One keep-alive pool for all GraphQL calls; history lookups run on
+        # several threads, so allow a few concurrent connections
+        self._session = requests.Session()
+        self._session.headers.update(self._headers)
+        self._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=10))
 
     def _graphql(self, query: str, variables: dict) -> dict:
         """Execute a GraphQL query against the Linear API."""
         payload = {"query": query, "variables": variables}
-        response = requests.post(LINEAR_API_URL, headers=self._headers, json=payload)
+        response = self._session.post(LINEAR_API_URL, json=payload)
         response.raise_for_status()
         data = response.json()
 
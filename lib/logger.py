@@ -1,6 +1,9 @@
 import os
 import logging
-from datetime import datetime
+from logging.handlers import TimedRotatingFileHandler
+
+LOG_FILENAME = 'logs/su_report.log'
+LOG_BACKUP_COUNT = 14
 
 # Configure logging
 def setup_logger():
@@ -8,13 +11,12 @@ def setup_logger():
     if not os.path.exists('logs'):
         os.makedirs('logs')
     
-    # Configure logging
-    log_filename = f'logs/su_report_{datetime.now().strftime("%Y%m%d")}.log'
+    # Configure logging; the file rolls over at midnight and keeps two weeks
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s [%(levelname)s] %(name)s: %(message)s',
         handlers=[
-            logging.FileHandler(log_filename),
+            TimedRotatingFileHandler(LOG_FILENAME, when='midnight', backupCount=LOG_BACKUP_COUNT),
             logging.StreamHandler()
         ]
     )
\ No newline at end of file
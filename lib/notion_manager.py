@@ -1,7 +1,19 @@
 import requests
 import base64
+import hashlib
+import json
 import logging
+import orjson
+import re
+import sys
+import threading
 import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lib.state_file import load_state, save_state
 
 logger = logging.getLogger(__name__)
 
@@ -9,11 +21,41 @@ logger = logging.getLogger(__name__)
 NOTION_API_VERSION = "2021-05-13"
 NOTION_BASE_URL = "https://api.notion.com/v1"
 JIRA_BASE_URL = "https://gogotech.atlassian.net"
+NOTION_PAGE_SIZE = 100  # Maximum page size accepted by the query endpoint
+
+# Property hashes and resulting last_edited_time of the last successful update
+# per ticket, used to skip PATCHes when neither Jira nor the page has changed
+NOTION_SYNC_CACHE_PATH = "logs/.sync_cache.json"
+
+# Formatted database records from the last full read, keyed by a per-database
+# generation counter that is bumped whenever this bot writes to Notion. The TTL
+# bounds staleness from edits made directly in Notion.
+NOTION_RECORDS_CACHE_PATH = "logs/.notion_records_cache.json"
+NOTION_GENERATION_PATH = "logs/.notion_generation.json"
+NOTION_RECORDS_CACHE_TTL = 3600  # seconds
+
+# Fields read from Jira for history tickets, and the batch size for bulk lookups
+JIRA_TICKET_FIELDS = ["summary", "status", "assignee", "customfield_10008", "customfield_10027"]
+JIRA_BULK_BATCH_SIZE = 100
 
 # Retry config for transient Notion errors (5xx / 429)
 NOTION_MAX_RETRIES = 3
 NOTION_RETRY_BACKOFF = [1, 2, 4]
 
+# Notion allows ~3 requests/second per integration; writes are spread over a
+# small worker pool and throttled by a shared limiter
+NOTION_RATE_LIMIT = 3
+NOTION_MAX_WORKERS = 4
+# History ticket lookups hit the issue tracker, not Notion, so can fan out wider
+HISTORY_FETCH_WORKERS = 8
+
+# Connection pool config for the persistent Notion / Jira sessions
+HTTP_POOL_CONNECTIONS = 4
+HTTP_POOL_MAXSIZE = 32
+JIRA_MAX_RETRIES = 3
+JIRA_RETRY_BACKOFF_FACTOR = 0.5
+JIRA_RETRY_STATUSES = [429, 500, 502, 503, 504]
+
 # Property names
 PROPERTY_NAMES = {
     "TICKET": "Ticket",
@@ -25,6 +67,32 @@ PROPERTY_NAMES = {
     "TAGS": "Tags"
 }
 
+# Property names resolved once; use these rather than indexing PROPERTY_NAMES
+_PROP_TICKET = PROPERTY_NAMES["TICKET"]
+_PROP_TITLE = PROPERTY_NAMES["TITLE"]
+_PROP_SP = PROPERTY_NAMES["SP"]
+_PROP_OWNER = PROPERTY_NAMES["OWNER"]
+_PROP_STATUS = PROPERTY_NAMES["STATUS"]
+_PROP_SPRINT = PROPERTY_NAMES["SPRINT"]
+_PROP_TAGS = PROPERTY_NAMES["TAGS"]
+
+class RateLimiter:
+    """Thread-safe limiter that spaces calls to at most `rate` per second"""
+
+    def __init__(self, rate):
+        self._interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self):
+        """Block until the caller may issue its next request"""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._interval
+        if wait > 0:
+            time.sleep(wait)
+
 class NotionManager:
     def __init__(self, notion_token, database_id, jira_user_name=None, jira_token=None,
                  issue_base_url=None, history_ticket_fetcher=None):
@@ -49,6 +117,8 @@ class NotionManager:
         self.jira_token = jira_token
         self.issue_base_url = issue_base_url or f"{JIRA_BASE_URL}/browse"
         self.history_ticket_fetcher = history_ticket_fetcher or self.__get_jira_ticket
+        # The built-in Jira fetcher can resolve history tickets in bulk via JQL
+        self._bulk_history_fetch = history_ticket_fetcher is None
         self.notion_headers = {
             "Authorization": notion_token,
             "Content-Type": "application/json",
@@ -62,24 +132,73 @@ class NotionManager:
         else:
             self.jira_headers = {}
 
+        self.notion_limiter = RateLimiter(NOTION_RATE_LIMIT)
+        self._sync_cache_path = NOTION_SYNC_CACHE_PATH
+        self._sync_cache = {}
+
+        # Notion writes are retried by __notion_request_with_retry, so its
+        # adapter only pools connections; Jira GETs retry at the adapter level.
+        self.notion_session = self.__build_session(self.notion_headers, HTTPAdapter(
+            pool_connections=HTTP_POOL_CONNECTIONS,
+            pool_maxsize=HTTP_POOL_MAXSIZE
+        ))
+        self.jira_session = self.__build_session(self.jira_headers, HTTPAdapter(
+            pool_connections=HTTP_POOL_CONNECTIONS,
+            pool_maxsize=HTTP_POOL_MAXSIZE,
+            max_retries=Retry(
+                total=JIRA_MAX_RETRIES,
+                backoff_factor=JIRA_RETRY_BACKOFF_FACTOR,
+                status_forcelist=JIRA_RETRY_STATUSES,
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+        ))
+
+    @staticmethod
+    def __build_session(headers, adapter):
+        """Create a keep-alive session carrying the given default headers"""
+        session = requests.Session()
+        session.headers.update(headers)
+        session.mount("https://", adapter)
+        return session
+
+    def __query_database_all(self, payload):
+        """Yield every result of a database query, following Notion's pagination cursor"""
+        notion_query_url = f"{NOTION_BASE_URL}/databases/{self.database_id}/query"
+        body = {**payload, "page_size": NOTION_PAGE_SIZE}
+
+        while True:
+            response = self.notion_session.post(notion_query_url, data=orjson.dumps(body))
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+
+            yield from data.get("results", [])
+
+            next_cursor = data.get("next_cursor")
+            if not data.get("has_more") or not next_cursor:
+                break
+            body["start_cursor"] = next_cursor
+
     def get_notion_work_record(self, sprint_name, owner=None):
         """Get work records from Notion database for a specific sprint and optionally filter by owner"""
-        logger.info(f"Getting work records for sprint: {sprint_name}" + (f" and owner: {owner}" if owner else ""))
-        notion_query_url = f"https://api.notion.com/v1/databases/{self.database_id}/query"
+        if owner:
+            logger.info("Getting work records for sprint: %s and owner: %s", sprint_name, owner)
+        else:
+            logger.info("Getting work records for sprint: %s", sprint_name)
         
         # Build filter based on parameters
         filters = []
         
         # Sprint filter
         filters.append({
-            "property": "Sprint",
+            "property": _PROP_SPRINT,
             "select": {"equals": sprint_name}
         })
         
         # Owner filter (if provided)
         if owner:
             filters.append({
-                "property": "Owner",
+                "property": _PROP_OWNER,
                 "select": {"equals": owner}
             })
         
@@ -93,75 +212,91 @@ class NotionManager:
                 }
             }
         
-        # Handle pagination
-        all_results = []
-        has_more = True
-        next_cursor = None
+        work_records = self.__format_record(self.__query_database_all(search_payload))
         
-        while has_more:
-            if next_cursor:
-                search_payload["start_cursor"] = next_cursor
-            
-            response = requests.post(notion_query_url, headers=self.notion_headers, json=search_payload)
-            response.raise_for_status()
-            data = response.json()
-            fields = data.get("fields") or {}
-            
-            all_results.extend(data.get("results", []))
-            has_more = data.get("has_more", False)
-            next_cursor = data.get("next_cursor")
-        
-        logger.debug(f"Retrieved {len(all_results)} work records")
-        return self.__format_record({"results": all_results})
+        logger.debug("Retrieved %s work records", len(work_records))
+        return work_records
 
     def get_all_records(self):
         """Get all records from Notion database"""
         logger.info("Getting all records from Notion database")
-        notion_query_url = f"https://api.notion.com/v1/databases/{self.database_id}/query"
         
-        # Query all records without filters, with pagination support
-        search_payload = {}
-        all_results = []
-        has_more = True
-        next_cursor = None
+        # Query all records without filters; pages are formatted as they stream in
+        work_records = self.__format_record(self.__query_database_all({}))
         
-        while has_more:
-            if next_cursor:
-                search_payload["start_cursor"] = next_cursor
-            
-            response = requests.post(notion_query_url, headers=self.notion_headers, json=search_payload)
-            response.raise_for_status()
-            data = response.json()
-            
-            all_results.extend(data.get("results", []))
-            has_more = data.get("has_more", False)
-            next_cursor = data.get("next_cursor")
-        
-        logger.info(f"Retrieved total of {len(all_results)} records from Notion database")
-        return self.__format_record({"results": all_results})
+        logger.info("Retrieved total of %s records from Notion database", len(work_records))
+        return work_records
 
-    def __format_record(self, work_record):
-        """Format Notion work record into a standardized format"""
-        formatted_work_records = []
-        for record in work_record["results"]:
+    def iter_all_records(self):
+        """Yield formatted records from the whole database as each page of results arrives.
+
+        Unlike get_all_records, records come in database order rather than
+        grouped by status.
+        """
+        return self.__iter_formatted_records(self.__query_database_all({}))
+
+    def iter_all_records_cached(self):
+        """Yield all records, reusing the on-disk copy while the database generation is unchanged"""
+        cache_key = f"notion:{self.database_id}:gen{load_state(NOTION_GENERATION_PATH).get(self.database_id, 0)}"
+        entry = load_state(NOTION_RECORDS_CACHE_PATH).get(cache_key)
+        if entry and time.time() - entry.get("ts", 0) < NOTION_RECORDS_CACHE_TTL:
+            logger.info("Using cached Notion records (%s)", cache_key)
+            yield from entry["records"]
+            return
+
+        work_records = []
+        for record in self.iter_all_records():
+            work_records.append(record)
+            yield record
+        logger.info("Retrieved total of %s records from Notion database", len(work_records))
+        # Drop older generations of this database; entries for other databases are kept
+        stale_prefix = f"notion:{self.database_id}:gen"
+        cache = {k: v for k, v in load_state(NOTION_RECORDS_CACHE_PATH).items() if not k.startswith(stale_prefix)}
+        cache[cache_key] = {"ts": time.time(), "records": work_records}
+        save_state(NOTION_RECORDS_CACHE_PATH, cache)
+
+    def bump_generation(self):
+        """Invalidate cached records for this database; call after writing to it"""
+        generations = load_state(NOTION_GENERATION_PATH)
+        generations[self.database_id] = generations.get(self.database_id, 0) + 1
+        save_state(NOTION_GENERATION_PATH, generations)
+        return generations[self.database_id]
+
+    def __format_record(self, results):
+        """Format an iterable of raw Notion pages into standardized work records"""
+        # Bucket records by status while parsing so the output comes out
+        # grouped in status order without a separate sort
+        records_by_status = defaultdict(list)
+        for work_record in self.__iter_formatted_records(results):
+            records_by_status[work_record["status"]].append(work_record)
+
+        return [r for status in sorted(records_by_status) for r in records_by_status[status]]
+
+    def __iter_formatted_records(self, results):
+        """Yield a standardized work record for each well-formed raw Notion page"""
+        first_record = True
+        issue_base_url = self.issue_base_url
+        for record in results:
             # Debug: Log available properties for first record
-            if len(formatted_work_records) == 0:
-                logger.debug(f"Available properties: {list(record['properties'].keys())}")
+            if first_record:
+                first_record = False
+                logger.debug("Available properties: %s", list(record['properties'].keys()))
             
             # Use correct property names from PROPERTY_NAMES constants
-            ticket_property = record["properties"].get(PROPERTY_NAMES["TICKET"])
-            title_property = record["properties"].get(PROPERTY_NAMES["TITLE"])
-            status_property = record["properties"].get(PROPERTY_NAMES["STATUS"])
-            owner_property = record["properties"].get(PROPERTY_NAMES["OWNER"])
-            sprint_property = record["properties"].get(PROPERTY_NAMES["SPRINT"])
-            tags_property = record["properties"].get(PROPERTY_NAMES["TAGS"])
+            props_get = record["properties"].get
+            ticket_property = props_get(_PROP_TICKET)
+            title_property = props_get(_PROP_TITLE)
+            status_property = props_get(_PROP_STATUS)
+            owner_property = props_get(_PROP_OWNER)
+            sprint_property = props_get(_PROP_SPRINT)
+            tags_property = props_get(_PROP_TAGS)
             
             # Safely extract values with error handling
             try:
                 if ticket_property and "title" in ticket_property and ticket_property["title"]:
                     jira_id = ticket_property["title"][0]["text"]["content"]
                 else:
-                    logger.warning(f"Missing or invalid ticket property in record: {record.get('id', 'unknown')}")
+                    logger.warning("Missing or invalid ticket property in record: %s", record.get('id', 'unknown'))
                     continue
                     
                 if title_property and "rich_text" in title_property and title_property["rich_text"]:
@@ -170,34 +305,34 @@ class NotionManager:
                     title = "No Title"
                     
                 if status_property and "select" in status_property and status_property["select"]:
-                    status = status_property["select"]["name"]
+                    status = sys.intern(status_property["select"]["name"])
                 else:
                     status = "Unknown Status"
                     
                 if owner_property and "select" in owner_property and owner_property["select"]:
-                    owner = owner_property["select"]["name"]
+                    owner = sys.intern(owner_property["select"]["name"])
                 else:
                     owner = "Unassigned"
                 
                 # Extract sprint from select property
                 sprint = None
                 if sprint_property and "select" in sprint_property and sprint_property["select"]:
-                    sprint = sprint_property["select"]["name"]
-                    logger.debug(f"Extracted sprint for {jira_id}: {sprint}")
+                    sprint = sys.intern(sprint_property["select"]["name"])
+                    logger.debug("Extracted sprint for %s: %s", jira_id, sprint)
                 else:
-                    logger.debug(f"No sprint found for {jira_id}, sprint_property: {sprint_property}")
+                    logger.debug("No sprint found for %s, sprint_property: %s", jira_id, sprint_property)
                     
                 # Extract tags from select property (not multi_select)
                 tags = []
                 if tags_property and "select" in tags_property and tags_property["select"]:
                     tags = [tags_property["select"]["name"]]
-                    logger.debug(f"Extracted tag for {jira_id}: {tags}")
+                    logger.debug("Extracted tag for %s: %s", jira_id, tags)
                 else:
-                    logger.debug(f"No tag found for {jira_id}, tags_property: {tags_property}")
+                    logger.debug("No tag found for %s, tags_property: %s", jira_id, tags_property)
                     
-                jira_url = f"{self.issue_base_url}/{jira_id}"
+                jira_url = f"{issue_base_url}/{jira_id}"
 
-                formatted_work_records.append({
+                yield {
                     "jiraId": jira_id,
                     "title": title,
                     "status": status,
@@ -205,27 +340,25 @@ class NotionManager:
                     "sprint": sprint,
                     "tags": tags,
                     "jiraUrl": jira_url
-                })
+                }
                 
             except (KeyError, IndexError, TypeError) as e:
-                logger.error(f"Error processing record {record.get('id', 'unknown')}: {e}")
+                logger.error("Error processing record %s: %s", record.get('id', 'unknown'), e)
                 continue
 
-        formatted_work_records.sort(key=lambda x: x["status"])
-        return formatted_work_records
-
     def __handle_api_error(self, operation, key, error):
         """Handle API errors consistently"""
-        error_msg = f"Failed to {operation} {key}"
         if hasattr(error, 'response') and hasattr(error.response, 'text'):
-            error_msg += f"\nError details: {error.response.text}"
-        logger.error(error_msg)
+            logger.error("Failed to %s %s\nError details: %s", operation, key, error.response.text)
+        else:
+            logger.error("Failed to %s %s", operation, key)
 
     def __notion_request_with_retry(self, method, url, **kwargs):
         """Issue a Notion HTTP request, retrying on transient 5xx / 429 errors."""
         for attempt in range(NOTION_MAX_RETRIES + 1):
             try:
-                response = requests.request(method, url, **kwargs)
+                self.notion_limiter.acquire()
+                response = self.notion_session.request(method, url, **kwargs)
                 response.raise_for_status()
                 return response
             except requests.exceptions.HTTPError as e:
@@ -241,8 +374,8 @@ class NotionManager:
                     except ValueError:
                         pass
                 logger.warning(
-                    f"Notion {method} {url} returned {status}, retrying in {delay}s "
-                    f"(attempt {attempt + 1}/{NOTION_MAX_RETRIES})"
+                    "Notion %s %s returned %s, retrying in %ss (attempt %s/%s)",
+                    method, url, status, delay, attempt + 1, NOTION_MAX_RETRIES
                 )
                 time.sleep(delay)
             except requests.exceptions.RequestException as e:
@@ -250,8 +383,8 @@ class NotionManager:
                     raise
                 delay = NOTION_RETRY_BACKOFF[min(attempt, len(NOTION_RETRY_BACKOFF) - 1)]
                 logger.warning(
-                    f"Notion {method} {url} network error: {e}, retrying in {delay}s "
-                    f"(attempt {attempt + 1}/{NOTION_MAX_RETRIES})"
+                    "Notion %s %s network error: %s, retrying in %ss (attempt %s/%s)",
+                    method, url, e, delay, attempt + 1, NOTION_MAX_RETRIES
                 )
                 time.sleep(delay)
 
@@ -265,261 +398,418 @@ class NotionManager:
 
         try:
             self.__notion_request_with_retry(
-                "POST", notion_url, headers=self.notion_headers, json=request_data
+                "POST", notion_url, data=orjson.dumps(request_data)
             )
         except requests.exceptions.RequestException as e:
             self.__handle_api_error("create", key, e)
             raise
 
     def __update_notion_page(self, page_id, key, properties):
-        """Update a Notion page with given properties"""
+        """Update a Notion page with given properties and return the updated page"""
         update_url = f"{NOTION_BASE_URL}/pages/{page_id}"
         update_data = {"properties": properties}
 
         try:
-            self.__notion_request_with_retry(
-                "PATCH", update_url, headers=self.notion_headers, json=update_data
+            response = self.__notion_request_with_retry(
+                "PATCH", update_url, data=orjson.dumps(update_data)
             )
+            return orjson.loads(response.content)
         except requests.exceptions.RequestException as e:
             self.__handle_api_error("update", key, e)
             raise
 
+    def __update_if_changed(self, page, key, properties):
+        """PATCH the page unless it is exactly as this sync last left it.
+
+        The skip requires both the properties we would send and the page's
+        last_edited_time to match the previous update, so pages edited by hand
+        in Notion since then are rewritten. Returns True when an update was
+        sent, False when it was skipped.
+        """
+        props_hash = hashlib.sha1(json.dumps(properties, sort_keys=True).encode()).hexdigest()
+        synced = self._sync_cache.get(key, {})
+        if (synced.get("props_hash") == props_hash
+                and synced.get("last_edited_time") == page.get("last_edited_time")):
+            logger.debug("Skipping unchanged ticket: %s", key)
+            return False
+
+        updated_page = self.__update_notion_page(page["id"], key, properties)
+        self._sync_cache[key] = {
+            "props_hash": props_hash,
+            "last_edited_time": updated_page.get("last_edited_time")
+        }
+        return True
+
     def __create_properties(self, key, summary, status, story_points, sprint, owner, url, tag=None):
         """Create Notion properties dictionary with common fields"""
         properties = {
-            PROPERTY_NAMES["TICKET"]: {"title": [{"text": {"content": key, "link": {"url": url}}}]},
-            PROPERTY_NAMES["TITLE"]: {"rich_text": [{"text": {"content": summary}}]},
-            PROPERTY_NAMES["SP"]: {"number": story_points if story_points is not None else 0},
-            PROPERTY_NAMES["OWNER"]: {"select": {"name": owner}},
-            PROPERTY_NAMES["STATUS"]: {"select": {"name": status}}
+            _PROP_TICKET: {"title": [{"text": {"content": key, "link": {"url": url}}}]},
+            _PROP_TITLE: {"rich_text": [{"text": {"content": summary}}]},
+            _PROP_SP: {"number": story_points if story_points is not None else 0},
+            _PROP_OWNER: {"select": {"name": owner}},
+            _PROP_STATUS: {"select": {"name": status}}
         }
         
         # Handle sprint based on its type
         if isinstance(sprint, list) and sprint:  # Jira sprint list
-            properties[PROPERTY_NAMES["SPRINT"]] = {"select": {"name": sprint[0]}}
+            properties[_PROP_SPRINT] = {"select": {"name": sprint[0]}}
         elif isinstance(sprint, dict) and sprint.get("select"):  # Notion sprint structure
-            properties[PROPERTY_NAMES["SPRINT"]] = sprint
+            properties[_PROP_SPRINT] = sprint
         # No sprint — omit the property entirely to avoid Notion validation errors
             
         if tag:
-            properties[PROPERTY_NAMES["TAGS"]] = {"select": {"name": tag}}
+            properties[_PROP_TAGS] = {"select": {"name": tag}}
             
         return properties
 
     def __get_jira_ticket(self, key):
         """Get ticket details from Jira API"""
         try:
-            response = requests.get(
+            response = self.jira_session.get(
                 f"{JIRA_BASE_URL}/rest/api/3/issue/{key}",
-                headers=self.jira_headers
+                params={"fields": ",".join(JIRA_TICKET_FIELDS)}
             )
             response.raise_for_status()
-            data = response.json()
-            fields = data.get("fields") or {}
-            
-            # Get sprint information
-            sprints = fields.get("customfield_10008", [])
-            if sprints is None:
-                sprints = []
-            active_sprints = [sprint["name"] for sprint in sprints if sprint["state"] == "active"]
-            assignee = fields.get("assignee")
-            if assignee is None:
-                logger.warning(f"JIRA ticket {key} has no assignee field")
-            if not isinstance(assignee, dict):
-                logger.warning(f"JIRA ticket {key} assignee type is unexpected: {type(assignee).__name__}")
-                assignee = {}
-            
-            return {
-                "key": key,
-                "summary": fields.get("summary", ""),
-                "status": (fields.get("status") or {}).get("name", "Unknown"),
-                "story_points": fields.get("customfield_10027", 0),
-                "active_sprints": active_sprints,
-                "owner": assignee.get("displayName", "Unassigned")
-            }
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to get JIRA ticket {key}: {e}")
+            return self.__parse_jira_ticket(key, orjson.loads(response.content))
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            logger.error("Failed to get JIRA ticket %s: %s", key, e)
             return None
 
-    def __sync_current_tickets(self, current_pages, jira_data):
-        """Sync Notion pages with current sprint data from Jira.
+    def __parse_jira_ticket(self, key, data):
+        """Convert a raw Jira issue into the ticket dict used for history sync"""
+        fields = data.get("fields") or {}
+        
+        # Get sprint information
+        sprints = fields.get("customfield_10008", [])
+        if sprints is None:
+            sprints = []
+        active_sprints = [sprint["name"] for sprint in sprints if sprint["state"] == "active"]
+        assignee = fields.get("assignee")
+        if assignee is None:
+            logger.warning("JIRA ticket %s has no assignee field", key)
+        if not isinstance(assignee, dict):
+            logger.warning("JIRA ticket %s assignee type is unexpected: %s", key, type(assignee).__name__)
+            assignee = {}
+        
+        return {
+            "key": key,
+            "summary": fields.get("summary", ""),
+            "status": (fields.get("status") or {}).get("name", "Unknown"),
+            "story_points": fields.get("customfield_10027", 0),
+            "active_sprints": active_sprints,
+            "owner": assignee.get("displayName", "Unassigned")
+        }
 
-        Returns (updated, created, failed) counts. Per-ticket failures are
-        logged and the loop continues so one bad page can't abort the batch.
-        """
-        current_tickets = {ticket["key"]: ticket for ticket in jira_data}
-        updated = created = failed = 0
+    def __search_jira_issues(self, jql):
+        """Yield raw issues for a JQL search, following nextPageToken"""
+        payload = {"jql": jql, "fields": JIRA_TICKET_FIELDS, "maxResults": JIRA_BULK_BATCH_SIZE}
+        while True:
+            response = self.jira_session.post(f"{JIRA_BASE_URL}/rest/api/3/search/jql", data=orjson.dumps(payload))
+            response.raise_for_status()
+            data = orjson.loads(response.content)
 
-        for key, page in current_pages.items():
-            try:
-                ticket = current_tickets[key]
-                url = f"{self.issue_base_url}/{key}"
-
-                logger.info(f"Updating ticket: {key}")
-
-                existing_tags = page["properties"].get(PROPERTY_NAMES["TAGS"], {}).get("multi_select", [])
-
-                properties = self.__create_properties(
-                    key,
-                    ticket["summary"],
-                    ticket["status"],
-                    ticket["story_points"],
-                    ticket["active_sprints"],
-                    page["properties"][PROPERTY_NAMES["OWNER"]]["select"]["name"],
-                    url,
-                    ticket["tag"]
-                )
+            yield from data.get("issues", [])
 
-                if existing_tags:
-                    properties[PROPERTY_NAMES["TAGS"]] = {"multi_select": existing_tags}
+            next_page_token = data.get("nextPageToken")
+            if data.get("isLast", True) or not next_page_token:
+                break
+            payload["nextPageToken"] = next_page_token
 
-                self.__update_notion_page(page["id"], key, properties)
-                updated += 1
-            except Exception as e:
-                failed += 1
-                logger.exception(f"Skipping current ticket {key} after error: {e}")
+    @staticmethod
+    def __jql_key_list(keys):
+        """Render keys as a quoted JQL list; keys come from free-text Notion titles"""
+        return ",".join('"' + key.replace("\\", "\\\\").replace('"', '\\"') + '"' for key in keys)
 
-        for key, ticket in current_tickets.items():
-            if key in current_pages:
-                continue
+    @staticmethod
+    def __rejected_keys(response, batch):
+        """Return the keys of a batch that a 400 response names as unknown or invalid"""
+        try:
+            messages = orjson.loads(response.content).get("errorMessages") or []
+        except (orjson.JSONDecodeError, AttributeError):
+            return set()
+        named = {token for message in messages for token in re.findall(r"'([^']+)'", message)}
+        return named.intersection(batch)
+
+    def __get_jira_tickets_bulk(self, keys):
+        """Fetch many Jira tickets with chunked `key in (...)` searches.
+
+        Returns ({key: ticket}, {key: error}). When Jira rejects a batch
+        because of unknown keys (deleted or mistyped tickets), those keys are
+        dropped and the rest of the batch is searched again; if the response
+        does not name them the batch is split in half instead. Keys a search
+        does not return (e.g. moved issues) and batches that fail for other
+        reasons fall back to per-key lookups. An issue that fails to parse is
+        reported in the error dict so it counts as one failed ticket.
+        """
+        tickets = {}
+        errors = {}
+        rejected = set()
+        fallback = []
+        pending = [keys[start:start + JIRA_BULK_BATCH_SIZE] for start in range(0, len(keys), JIRA_BULK_BATCH_SIZE)]
+        while pending:
+            batch = pending.pop()
             try:
-                logger.info(f"Creating new ticket: {key}")
-                url = f"{self.issue_base_url}/{key}"
-                properties = self.__create_properties(
-                    key,
-                    ticket["summary"],
-                    ticket["status"],
-                    ticket["story_points"],
-                    ticket["active_sprints"],
-                    ticket["owner"],
-                    url,
-                    ticket["tag"]
-                )
+                issues = list(self.__search_jira_issues(f"key in ({self.__jql_key_list(batch)})"))
+            except requests.exceptions.HTTPError as e:
+                if e.response is None or e.response.status_code != 400:
+                    logger.warning("Bulk Jira lookup failed, falling back to per-key fetch: %s", e)
+                    fallback.extend(batch)
+                    continue
+                invalid = self.__rejected_keys(e.response, batch)
+                if invalid:
+                    rejected.update(invalid)
+                    remaining = [key for key in batch if key not in invalid]
+                    if remaining:
+                        pending.append(remaining)
+                elif len(batch) > 1:
+                    middle = len(batch) // 2
+                    pending.extend((batch[:middle], batch[middle:]))
+                else:
+                    rejected.update(batch)
+                continue
+            except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+                logger.warning("Bulk Jira lookup failed, falling back to per-key fetch: %s", e)
+                fallback.extend(batch)
+                continue
+
+            for issue in issues:
+                key = issue.get("key")
+                try:
+                    ticket = self.__parse_jira_ticket(key, issue)
+                except Exception as e:
+                    errors[key] = e
+                    continue
+                tickets[key] = ticket
+            fallback.extend(key for key in batch if key not in tickets and key not in errors)
+
+        if rejected:
+            logger.info("Jira rejected %s unknown ticket key(s): %s", len(rejected), sorted(rejected))
+
+        missing = [(key, partial(self.__get_jira_ticket, key)) for key in fallback]
+        for key, ticket, error in self.__run_parallel(missing, max_workers=HISTORY_FETCH_WORKERS):
+            if error is not None:
+                errors[key] = error
+            elif ticket is not None:
+                tickets[key] = ticket
+        return tickets, errors
+
+    def __run_parallel(self, tasks, max_workers=NOTION_MAX_WORKERS):
+        """Run (key, callable) tasks on a bounded thread pool.
+
+        Yields (key, result, error) tuples in submission order; exactly one of
+        result / error is set. Notion calls inside the tasks are throttled by
+        the shared rate limiter.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [(key, executor.submit(task)) for key, task in tasks]
+            for key, future in futures:
+                try:
+                    yield key, future.result(), None
+                except Exception as e:
+                    yield key, None, e
+
+    def __update_current_page(self, key, page, ticket):
+        """Update an existing Notion page from its current sprint ticket"""
+        url = f"{self.issue_base_url}/{key}"
+
+        logger.info("Updating ticket: %s", key)
+
+        existing_tags = page["properties"].get(_PROP_TAGS, {}).get("multi_select", [])
+
+        properties = self.__create_properties(
+            key,
+            ticket["summary"],
+            ticket["status"],
+            ticket["story_points"],
+            ticket["active_sprints"],
+            page["properties"][_PROP_OWNER]["select"]["name"],
+            url,
+            ticket["tag"]
+        )
+
+        if existing_tags:
+            properties[_PROP_TAGS] = {"multi_select": existing_tags}
+
+        return self.__update_if_changed(page, key, properties)
+
+    def __create_current_page(self, key, ticket):
+        """Create a Notion page for a current sprint ticket not yet in the database"""
+        logger.info("Creating new ticket: %s", key)
+        url = f"{self.issue_base_url}/{key}"
+        properties = self.__create_properties(
+            key,
+            ticket["summary"],
+            ticket["status"],
+            ticket["story_points"],
+            ticket["active_sprints"],
+            ticket["owner"],
+            url,
+            ticket["tag"]
+        )
+
+        self.__create_notion_page(key, properties)
+
+    def __sync_current_tickets(self, current_pages, jira_data):
+        """Sync Notion pages with current sprint data from Jira.
 
-                self.__create_notion_page(key, properties)
+        Returns (updated, unchanged, created, failed) counts. Per-ticket
+        failures are logged and the batch continues so one bad page can't
+        abort it.
+        """
+        current_tickets = {ticket["key"]: ticket for ticket in jira_data}
+        updated = unchanged = created = failed = 0
+
+        update_page = self.__update_current_page
+        update_tasks = [
+            (key, partial(update_page, key, page, current_tickets[key]))
+            for key, page in current_pages.items()
+        ]
+        for key, changed, error in self.__run_parallel(update_tasks):
+            if error is not None:
+                failed += 1
+                logger.error("Skipping current ticket %s after error: %s", key, error, exc_info=error)
+            elif changed:
+                updated += 1
+            else:
+                unchanged += 1
+
+        create_page = self.__create_current_page
+        create_tasks = [
+            (key, partial(create_page, key, ticket))
+            for key, ticket in current_tickets.items()
+            if key not in current_pages
+        ]
+        for key, _, error in self.__run_parallel(create_tasks):
+            if error is None:
                 created += 1
-            except Exception as e:
+            else:
                 failed += 1
-                logger.exception(f"Skipping new ticket {key} after error: {e}")
+                logger.error("Skipping new ticket %s after error: %s", key, error, exc_info=error)
 
         if created > 0:
-            logger.info(f"Created {created} new tickets")
-        return updated, created, failed
+            logger.info("Created %s new tickets", created)
+        return updated, unchanged, created, failed
 
-    def __sync_history_tickets(self, history_pages, jira_data):
-        """Sync Notion pages that are not in current sprint with Jira data.
+    def __update_history_page(self, key, page, ticket):
+        """Refresh a Notion page outside the current sprint from its fetched ticket"""
+        url = f"{self.issue_base_url}/{key}"
 
-        Returns (updated, skipped, failed) counts. Per-ticket failures are
-        logged and the loop continues.
-        """
-        updated = skipped = failed = 0
+        logger.info("Updating history ticket: %s", key)
 
-        for key, page in history_pages.items():
-            try:
-                url = f"{self.issue_base_url}/{key}"
+        existing_tags = page["properties"].get(_PROP_TAGS, {}).get("multi_select", [])
 
-                ticket = self.history_ticket_fetcher(key)
-                if ticket is None:
-                    logger.info(f"Skipping update for {key}: Failed to get issue status")
-                    skipped += 1
-                    continue
+        properties = self.__create_properties(
+            key,
+            ticket["summary"],
+            ticket["status"],
+            ticket["story_points"],
+            page["properties"][_PROP_SPRINT],
+            page["properties"][_PROP_OWNER]["select"]["name"],
+            url
+        )
 
-                logger.info(f"Updating history ticket: {key}")
+        if existing_tags:
+            properties[_PROP_TAGS] = {"multi_select": existing_tags}
 
-                existing_tags = page["properties"].get(PROPERTY_NAMES["TAGS"], {}).get("multi_select", [])
+        return self.__update_if_changed(page, key, properties)
 
-                properties = self.__create_properties(
-                    key,
-                    ticket["summary"],
-                    ticket["status"],
-                    ticket["story_points"],
-                    page["properties"][PROPERTY_NAMES["SPRINT"]],
-                    page["properties"][PROPERTY_NAMES["OWNER"]]["select"]["name"],
-                    url
-                )
+    def __sync_history_tickets(self, history_pages, jira_data):
+        """Sync Notion pages that are not in current sprint with Jira data.
 
-                if existing_tags:
-                    properties[PROPERTY_NAMES["TAGS"]] = {"multi_select": existing_tags}
+        Returns (updated, unchanged, skipped, failed) counts. Per-ticket
+        failures are logged and the batch continues.
+        """
+        updated = unchanged = skipped = failed = 0
 
-                self.__update_notion_page(page["id"], key, properties)
-                updated += 1
-            except Exception as e:
+        # Fetch every history ticket up front so the lookups overlap (or are
+        # batched) instead of each costing a full round-trip before its update
+        if self._bulk_history_fetch:
+            tickets, errors = self.__get_jira_tickets_bulk(list(history_pages))
+            fetched = ((key, tickets.get(key), errors.get(key)) for key in history_pages)
+        else:
+            fetch_tasks = [
+                (key, partial(self.history_ticket_fetcher, key))
+                for key in history_pages
+            ]
+            fetched = self.__run_parallel(fetch_tasks, max_workers=HISTORY_FETCH_WORKERS)
+
+        update_page = self.__update_history_page
+        update_tasks = []
+        for key, ticket, error in fetched:
+            if error is not None:
                 failed += 1
-                logger.exception(f"Skipping history ticket {key} after error: {e}")
+                logger.error("Skipping history ticket %s after error: %s", key, error, exc_info=error)
+            elif ticket is None:
+                logger.info("Skipping update for %s: Failed to get issue status", key)
+                skipped += 1
+            else:
+                update_tasks.append((key, partial(update_page, key, history_pages[key], ticket)))
 
-        return updated, skipped, failed
+        for key, changed, error in self.__run_parallel(update_tasks):
+            if error is not None:
+                failed += 1
+                logger.error("Skipping history ticket %s after error: %s", key, error, exc_info=error)
+            elif changed:
+                updated += 1
+            else:
+                unchanged += 1
+
+        return updated, unchanged, skipped, failed
 
     def update(self, jira_data):
         """Main function to sync Jira and Notion data"""
         logger.info("Starting sync process...")
         
         try:
-            # Get all existing pages from Notion with pagination support
-            notion_query_url = f"{NOTION_BASE_URL}/databases/{self.database_id}/query"
-            all_results = []
-            has_more = True
-            next_cursor = None
-            
-            while has_more:
-                request_payload = {}
-                if next_cursor:
-                    request_payload["start_cursor"] = next_cursor
-                
-                response = requests.post(notion_query_url, headers=self.notion_headers, json=request_payload)
-                response.raise_for_status()
-                data = response.json()
-                
-                all_results.extend(data.get("results", []))
-                has_more = data.get("has_more", False)
-                next_cursor = data.get("next_cursor")
-            
-            logger.info(f"Retrieved {len(all_results)} existing records from Notion")
-            
-            # Create notion_pages structure compatible with existing code
-            notion_pages = {"results": all_results}
-            
             # Create sets of current sprint and history pages
             current_sprint_tickets = {ticket["key"] for ticket in jira_data}
             current_pages = {}
             history_pages = {}
+            total_pages = 0
             
-            for page in notion_pages.get("results", []):
+            # Stream existing pages from Notion straight into the partition
+            for page in self.__query_database_all({}):
+                total_pages += 1
                 # 安全地獲取 ticket key
-                ticket_property = page["properties"].get(PROPERTY_NAMES["TICKET"])
-                if not ticket_property or "title" not in ticket_property:
-                    logger.warning(f"Skipping page {page.get('id', 'unknown')}: Missing ticket property")
+                try:
+                    key = page["properties"][_PROP_TICKET]["title"][0]["text"]["content"]
+                except (KeyError, IndexError, TypeError):
+                    logger.warning("Skipping page %s: Missing or empty ticket property", page.get('id', 'unknown'))
                     continue
-                
-                title_array = ticket_property["title"]
-                if not title_array or len(title_array) == 0:
-                    logger.warning(f"Skipping page {page.get('id', 'unknown')}: Empty title array")
-                    continue
-                
-                key = title_array[0]["text"]["content"]
-                
-                if key in current_sprint_tickets:
-                    current_pages[key] = page
-                else:
-                    history_pages[key] = page
+                (current_pages if key in current_sprint_tickets else history_pages)[key] = page
+            
+            logger.info("Retrieved %s existing records from Notion", total_pages)
             
-            logger.info(f"Current sprint: {len(current_pages)} pages, History: {len(history_pages)} pages")
+            logger.info("Current sprint: %s pages, History: %s pages", len(current_pages), len(history_pages))
 
-            cur_updated, cur_created, cur_failed = self.__sync_current_tickets(current_pages, jira_data)
-            hist_updated, hist_skipped, hist_failed = self.__sync_history_tickets(history_pages, jira_data)
+            self._sync_cache = load_state(self._sync_cache_path)
+            try:
+                cur_updated, cur_unchanged, cur_created, cur_failed = self.__sync_current_tickets(
+                    current_pages, jira_data
+                )
+                hist_updated, hist_unchanged, hist_skipped, hist_failed = self.__sync_history_tickets(
+                    history_pages, jira_data
+                )
+            finally:
+                save_state(self._sync_cache_path, self._sync_cache)
+                # Pages may have been written, so cached records are stale
+                self.bump_generation()
 
             total_failed = cur_failed + hist_failed
             logger.info(
-                f"Sync summary — current: {cur_updated} updated, {cur_created} created, {cur_failed} failed; "
-                f"history: {hist_updated} updated, {hist_skipped} skipped, {hist_failed} failed"
+                "Sync summary — current: %s updated, %s unchanged, %s created, %s failed; "
+                "history: %s updated, %s unchanged, %s skipped, %s failed",
+                cur_updated, cur_unchanged, cur_created, cur_failed,
+                hist_updated, hist_unchanged, hist_skipped, hist_failed
             )
             if total_failed > 0:
-                logger.warning(f"Sync process completed with {total_failed} failed ticket(s)")
+                logger.warning("Sync process completed with %s failed ticket(s)", total_failed)
             else:
                 logger.info("Sync process completed successfully")
             return
 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to sync with Notion: {e}")
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            logger.error("Failed to sync with Notion: %s", e)
 
         logger.info("Sync process completed")
 
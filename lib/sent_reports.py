@@ -0,0 +1,41 @@
+import time
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from lib.state_file import load_state, save_state
+
+logger = logging.getLogger(__name__)
+
+# Digest of the last report sent to each Slack user. A rerun within the same
+# week skips users whose report has not changed; older entries are ignored so
+# every weekly run still delivers.
+SENT_REPORTS_TTL = 6 * 24 * 3600  # seconds
+
+
+def send_changed_reports(slack_manager, payloads, slack_token, state_path, max_workers):
+    """Send (owner, message, slack_user_id) reports concurrently, skipping any identical
+    to the one last sent to that user, and record the digests of successful sends"""
+    sent_reports = load_state(state_path)
+    pending = []
+    for owner, message, slack_user_id in payloads:
+        digest = hashlib.sha256(message.encode()).hexdigest()
+        last_sent = sent_reports.get(slack_user_id, {})
+        if last_sent.get("digest") == digest and time.time() - last_sent.get("ts", 0) < SENT_REPORTS_TTL:
+            logger.info("Report for %s unchanged since last send, skipping", owner)
+            continue
+        pending.append((owner, message, slack_user_id, digest))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(
+            lambda p: slack_manager.send_direct_message(p[1], p[2], slack_token),
+            pending
+        ))
+
+    for (owner, _, slack_user_id, digest), success in zip(pending, results):
+        if success:
+            sent_reports[slack_user_id] = {"digest": digest, "ts": time.time()}
+            logger.info("Weekly report sent successfully to %s", owner)
+        else:
+            logger.warning("Failed to send weekly report to %s", owner)
+
+    save_state(state_path, sent_reports)
@@ -1,15 +1,62 @@
 import os
 import logging
+import orjson
+import random
 import requests
-from typing import Dict, Any, List
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, List, Tuple
+
+# Concurrent direct messages in flight, shared by send_report and the weekly report scripts
+SLACK_MAX_WORKERS = 3
+
+# Retries for rate-limited (HTTP 429) Slack calls; the wait follows Slack's
+# Retry-After header plus up to a second of jitter so parallel senders spread out
+SLACK_MAX_RETRIES = 3
+SLACK_DEFAULT_RETRY_AFTER = 1  # seconds, when the header is missing
 
 class SlackManager:
     """Manager for Slack Bot API operations and direct message formatting"""
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        # Reuse one keep-alive connection pool for all Slack API calls
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=10))
+        # DM channel ids are stable per user, so conversations.open is only needed once
+        self._dm_channels: Dict[str, str] = {}
     
-
+    def _post(self, url: str, payload: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
+        """POST a JSON payload to the Slack Web API and return the decoded body"""
+        body = orjson.dumps(payload)
+        for attempt in range(SLACK_MAX_RETRIES + 1):
+            response = self.session.post(url, headers=headers, data=body, timeout=10)
+            if response.status_code != 429 or attempt == SLACK_MAX_RETRIES:
+                break
+            try:
+                retry_after = int(response.headers.get("Retry-After", SLACK_DEFAULT_RETRY_AFTER))
+            except ValueError:
+                retry_after = SLACK_DEFAULT_RETRY_AFTER
+            self.logger.warning("Slack rate limited %s, retrying in %ss", url, retry_after)
+            time.sleep(retry_after + random.random())
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    
+    def _open_conversation(self, user_id: str, headers: Dict[str, str]) -> str | None:
+        """Open (or look up) the DM channel for a user, caching its id"""
+        open_data = self._post(
+            "https://slack.com/api/conversations.open", {"users": user_id}, headers
+        )
+        
+        if not open_data.get("ok"):
+            self.logger.error("Failed to open conversation: %s", open_data.get('error'))
+            return None
+        
+        channel_id = open_data["channel"]["id"]
+        self._dm_channels[user_id] = channel_id
+        return channel_id
     
     def send_direct_message(self, message: str, user_id: str, slack_token: str) -> bool:
         """Send direct message to a specific user using conversations.open API"""
@@ -18,44 +65,40 @@ class SlackManager:
             return False
         
         try:
-            # First, open a conversation with the user
-            open_conversation_url = "https://slack.com/api/conversations.open"
-            open_payload = {"users": user_id}
-            open_headers = {
+            headers = {
                 "Authorization": f"Bearer {slack_token}",
                 "Content-Type": "application/json"
             }
+            post_message_url = "https://slack.com/api/chat.postMessage"
             
-            open_response = requests.post(open_conversation_url, headers=open_headers, json=open_payload, timeout=10)
-            open_response.raise_for_status()
-            open_data = open_response.json()
-            
-            if not open_data.get("ok"):
-                self.logger.error(f"Failed to open conversation: {open_data.get('error')}")
-                return False
-            
-            channel_id = open_data["channel"]["id"]
+            # First, open a conversation with the user unless we already know the channel
+            channel_id = self._dm_channels.get(user_id)
+            cached = channel_id is not None
+            if not cached:
+                channel_id = self._open_conversation(user_id, headers)
+                if not channel_id:
+                    return False
             
             # Then, send the message to the opened conversation
-            post_message_url = "https://slack.com/api/chat.postMessage"
-            message_payload = {
-                "channel": channel_id,
-                "text": message
-            }
+            message_data = self._post(post_message_url, {"channel": channel_id, "text": message}, headers)
             
-            message_response = requests.post(post_message_url, headers=open_headers, json=message_payload, timeout=10)
-            message_response.raise_for_status()
-            message_data = message_response.json()
+            # A cached channel may have gone stale; reopen it once and retry
+            if cached and message_data.get("error") == "channel_not_found":
+                self._dm_channels.pop(user_id, None)
+                channel_id = self._open_conversation(user_id, headers)
+                if not channel_id:
+                    return False
+                message_data = self._post(post_message_url, {"channel": channel_id, "text": message}, headers)
             
             if not message_data.get("ok"):
-                self.logger.error(f"Failed to send message: {message_data.get('error')}")
+                self.logger.error("Failed to send message: %s", message_data.get('error'))
                 return False
             
-            self.logger.info(f"Direct message sent to user {user_id} successfully")
+            self.logger.info("Direct message sent to user %s successfully", user_id)
             return True
             
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"Failed to send direct message to user {user_id}: {e}")
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            self.logger.error("Failed to send direct message to user %s: %s", user_id, e)
             return False
     
     def format_sprint_report(self, report_data: Dict[str, Any]) -> str:
@@ -63,27 +106,18 @@ class SlackManager:
         sprint_name = report_data["sprint_name"]
         total_records = report_data["total_records"]
         
-        message = f"*📊 SPRINT REPORT [{sprint_name}]*\n"
-        message += f"*📈 Total records: {total_records}*\n\n"
+        parts = [
+            f"*📊 SPRINT REPORT [{sprint_name}]*\n",
+            f"*📈 Total records: {total_records}*\n\n"
+        ]
         
-        # Get all records and sort by status
-        all_records = []
-        for status, records in report_data["status_groups"].items():
+        # Records are already grouped by status; walk the groups in status order
+        for status, records in sorted(report_data["status_groups"].items()):
             for record in records:
-                all_records.append({
-                    **record,
-                    "status": status
-                })
-        
-        # Sort by status
-        all_records.sort(key=lambda x: x["status"])
+                ticket_link = f"<{record['jira_url']}|{record['ticket_id']}>"
+                parts.append(f"• {ticket_link}: {record['title']} `{status}`\n")
         
-        # Format each record
-        for record in all_records:
-            ticket_link = f"<{record['jira_url']}|{record['ticket_id']}>"
-            message += f"• {ticket_link}: {record['title']} `{record['status']}`\n"
-        
-        return message
+        return "".join(parts)
     
     def _extract_active_sprints(self, jira_data: List[Dict[str, Any]]) -> set:
         """Extract active sprints from Jira data"""
@@ -100,7 +134,7 @@ class SlackManager:
             if record.get("sprint") == sprint_name and record.get("owner") == owner
         ]
         
-        self.logger.info(f"Filtered {len(filtered_records)} records for sprint '{sprint_name}' and owner '{owner}'")
+        self.logger.info("Filtered %s records for sprint '%s' and owner '%s'", len(filtered_records), sprint_name, owner)
         return filtered_records
     
     def _group_records_by_status(self, records: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
@@ -141,29 +175,27 @@ class SlackManager:
     
     def _log_sprint_report(self, report_data: Dict[str, Any], owner: str):
         """Log sprint report information"""
+        # Skip building the per-record lines when INFO is not being emitted
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        
         sprint_name = report_data["sprint_name"]
         total_records = report_data["total_records"]
         
-        self.logger.info(f"\n{'='*80}")
-        self.logger.info(f"📊 SPRINT REPORT {sprint_name} - Owner: {owner}")
-        self.logger.info(f"📈 Total records: {total_records}")
-        self.logger.info(f"{'='*80}")
+        lines = [
+            f"\n{'='*80}",
+            f"📊 SPRINT REPORT {sprint_name} - Owner: {owner}",
+            f"📈 Total records: {total_records}",
+            f"{'='*80}"
+        ]
         
-        # Get all records and sort by status
-        all_records = []
-        for status, records in report_data["status_groups"].items():
+        # One line per record, walking the status groups in order
+        for status, records in sorted(report_data["status_groups"].items()):
             for record in records:
-                all_records.append({
-                    **record,
-                    "status": status
-                })
-        
-        # Sort by status
-        all_records.sort(key=lambda x: x["status"])
+                lines.append(f"  • {record['ticket_id']}: {record['title']} `{status}`")
         
-        # Log each record
-        for record in all_records:
-            self.logger.info(f"  • {record['ticket_id']}: {record['title']} `{record['status']}`")
+        # Emit the whole report as a single log record
+        self.logger.info("\n".join(lines))
     
     def send_sprint_report(self, report_data: Dict[str, Any], user_id: str, slack_token: str) -> bool:
         """Send sprint report to Slack via direct message"""
@@ -189,9 +221,15 @@ class SlackManager:
             self.logger.info("No active sprints found in Jira data")
             return []
         
-        self.logger.info(f"Active sprints found: {sorted(active_sprints)}")
+        self.logger.info("Active sprints found: %s", sorted(active_sprints))
+        
+        # Index notion records by (sprint, owner) once instead of rescanning per user and sprint
+        records_index = defaultdict(list)
+        for record in notion_records:
+            records_index[(record.get("sprint"), record.get("owner"))].append(record)
         
         # Process each user
+        pending = []
         for user_config in jira_users:
             issue_user_id = user_config.get("issue_user_id")
             slack_user_id = user_config.get("slack_user_id")
@@ -199,44 +237,62 @@ class SlackManager:
 
             # Skip if no issue tracker user ID or slack_user_id is empty
             if not issue_user_id or not slack_user_id:
-                self.logger.info(f"Skipping user {owner} - missing issue_user_id or slack_user_id")
+                self.logger.info("Skipping user %s - missing issue_user_id or slack_user_id", owner)
                 continue
                 
             try:
-                self.logger.info(f"Processing reports for user: {owner}")
+                self.logger.info("Processing reports for user: %s", owner)
+                user_reports = []
                 
                 # Process each active sprint for this user
                 for sprint_name in sorted(active_sprints):
+                    # Sprints with no records for this user need no work at all
+                    sprint_records = records_index.get((sprint_name, owner))
+                    if not sprint_records:
+                        continue
+                    
                     try:
-                        # Filter notion records for this sprint and owner
-                        sprint_records = self._filter_sprint_records(notion_records, sprint_name, owner)
+                        self.logger.info("\n%s", "=" * 60)
+                        self.logger.info("Processing Sprint: %s for user: %s", sprint_name, owner)
+                        self.logger.info("=" * 60)
+                        self.logger.info("Found %s records in Notion for sprint '%s', proceeding with report...", len(sprint_records), sprint_name)
                         
-                        # Only proceed if filtered records count > 0
-                        if sprint_records and len(sprint_records) > 0:
-                            self.logger.info(f"\n{'='*60}")
-                            self.logger.info(f"Processing Sprint: {sprint_name} for user: {owner}")
-                            self.logger.info(f"{'='*60}")
-                            self.logger.info(f"Found {len(sprint_records)} records in Notion for sprint '{sprint_name}', proceeding with report...")
-                            
-                            # Create report data
-                            report_data = self._create_report_data(sprint_name, sprint_records)
-                            
-                            # Log sprint report
-                            self._log_sprint_report(report_data, owner)
-                            
-                            # Send to Slack via direct message
-                            self.send_sprint_report(report_data, user_id=slack_user_id, slack_token=slack_token)
-                            
-                            all_report_data.append(report_data)
-                            
-                        # No logging for sprints with no records
+                        # Create report data
+                        report_data = self._create_report_data(sprint_name, sprint_records)
+                        
+                        # Log sprint report
+                        self._log_sprint_report(report_data, owner)
+                        
+                        # Queue the direct message; each user's reports are sent in sprint order below
+                        user_reports.append((sprint_name, report_data))
+                        
+                        all_report_data.append(report_data)
                             
                     except Exception as e:
-                        self.logger.error(f"Error getting records for sprint '{sprint_name}' for user {owner}: {e}")
+                        self.logger.error("Error getting records for sprint '%s' for user %s: %s", sprint_name, owner, e)
+                
+                if user_reports:
+                    pending.append((owner, slack_user_id, user_reports))
                 
             except Exception as e:
-                self.logger.error(f"Failed to process reports for user {owner}: {e}")
+                self.logger.error("Failed to process reports for user %s: %s", owner, e)
                 continue
         
+        # Send to Slack via direct message, a few users at a time to stay within rate limits
+        with ThreadPoolExecutor(max_workers=SLACK_MAX_WORKERS) as executor:
+            list(executor.map(
+                lambda item: self._send_user_reports(*item, slack_token=slack_token),
+                pending
+            ))
+        
         self.logger.info("Sprint report processing completed for all users")
         return all_report_data
+    
+    def _send_user_reports(self, owner: str, slack_user_id: str,
+                           user_reports: List[Tuple[str, Dict[str, Any]]], slack_token: str) -> None:
+        """Send one user's sprint reports one after another, in sprint order"""
+        for sprint_name, report_data in user_reports:
+            try:
+                self.send_sprint_report(report_data, user_id=slack_user_id, slack_token=slack_token)
+            except Exception as e:
+                self.logger.error("Error getting records for sprint '%s' for user %s: %s", sprint_name, owner, e)
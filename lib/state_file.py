@@ -0,0 +1,28 @@
+import os
+import logging
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Small JSON state files under logs/ (caches, sync hashes, sent-report digests)
+# shared by the managers and report scripts. A missing or corrupt file reads as
+# empty and a failed write only logs, so state never breaks a run.
+
+
+def load_state(path):
+    """Load a JSON state file, returning an empty dict if it is missing or unreadable"""
+    try:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return {}
+
+
+def save_state(path, data):
+    """Write a JSON state file, creating its directory; failures are logged and ignored"""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(data))
+    except (OSError, orjson.JSONEncodeError) as e:
+        logger.warning("Failed to write %s: %s", path, e)
@@ -1,6 +1,7 @@
 import os
 import logging
-import json
+import orjson
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 from lib.notion_manager import NotionManager
 from lib.jira_manager import JiraManager
@@ -20,8 +21,8 @@ JIRA_USER_NAME = os.getenv("JIRA_USER_NAME")
 # Parse JIRA_USERS from JSON string
 JIRA_USERS_JSON = os.getenv("JIRA_USERS", "[]")
 try:
-    JIRA_USERS = json.loads(JIRA_USERS_JSON)
-except (json.JSONDecodeError, ImportError) as e:
+    JIRA_USERS = orjson.loads(JIRA_USERS_JSON)
+except (orjson.JSONDecodeError, ImportError) as e:
     logging.error(f"Failed to parse JIRA_USERS JSON: {e}")
     JIRA_USERS = []
 
@@ -66,8 +67,7 @@ def main():
 
         # Get jira data
         logger.info("Fetching JIRA data...")
-        jira_data = jira_manager.get_tickets()
-        jira_data = jira_manager.filter_data(jira_data)
+        jira_data = jira_manager.get_tickets_filtered()
         logger.info(f"Retrieved {len(jira_data)} JIRA tickets")
 
         # Sync status from Jira and update notion
@@ -89,12 +89,11 @@ def main():
         logger.info("SU Report Bot completed successfully")
 
     except Exception as e:
-        error_message = f"Error occurred in SU Report Bot:\n\n*Error Type:* {type(e).__name__}\n*Error Message:* {str(e)}\n*Timestamp:* {logging.Formatter().formatTime(logging.LogRecord('', 0, '', 0, '', (), None))}"
-        
         logger.error(f"SU Report Bot failed: {e}", exc_info=True)
         
         # Send error notification to Slack
         if slack_manager and slack_token:
+            error_message = f"Error occurred in SU Report Bot:\n\n*Error Type:* {type(e).__name__}\n*Error Message:* {str(e)}\n*Timestamp:* {datetime.now(timezone.utc).isoformat(timespec='seconds')}"
             send_error_to_slack(error_message, slack_manager, slack_token)
         
         # Re-raise the exception to ensure proper exit code
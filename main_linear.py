@@ -1,6 +1,7 @@
 import os
 import logging
-import json
+import orjson
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 from lib.notion_manager import NotionManager
 from lib.linear_manager import LinearManager
@@ -15,8 +16,8 @@ LINEAR_ORG_SLUG = os.getenv("LINEAR_ORG_SLUG")
 
 LINEAR_USERS_JSON = os.getenv("LINEAR_USERS", "[]")
 try:
-    LINEAR_USERS = json.loads(LINEAR_USERS_JSON)
-except (json.JSONDecodeError, TypeError) as e:
+    LINEAR_USERS = orjson.loads(LINEAR_USERS_JSON)
+except (orjson.JSONDecodeError, TypeError) as e:
     logging.error(f"Failed to parse LINEAR_USERS JSON: {e}")
     LINEAR_USERS = []
 
@@ -83,15 +84,15 @@ def main():
         logger.info("Linear Report Bot completed successfully")
 
     except Exception as e:
-        error_message = (
-            f"Error occurred in Linear Report Bot:\n\n"
-            f"*Error Type:* {type(e).__name__}\n"
-            f"*Error Message:* {str(e)}\n"
-            f"*Timestamp:* {logging.Formatter().formatTime(logging.LogRecord('', 0, '', 0, '', (), None))}"
-        )
         logger.error(f"Linear Report Bot failed: {e}", exc_info=True)
 
         if slack_manager and slack_token:
+            error_message = (
+                f"Error occurred in Linear Report Bot:\n\n"
+                f"*Error Type:* {type(e).__name__}\n"
+                f"*Error Message:* {str(e)}\n"
+                f"*Timestamp:* {datetime.now(timezone.utc).isoformat(timespec='seconds')}"
+            )
             send_error_to_slack(error_message, slack_manager, slack_token)
 
         raise